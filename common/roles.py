@@ -0,0 +1,27 @@
+"""
+Проверки ролей пользователя, общие для views и классов прав.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+ADMIN_ROLE = "Администратор"
+
+
+def is_admin(user: Any) -> bool:
+    """
+    Является ли пользователь администратором (персонал или роль «Администратор»).
+
+    За один запрос проверка вызывается из ``get_queryset`` и из классов прав,
+    поэтому результат запоминается на объекте пользователя.
+    """
+    cached = getattr(user, "_is_admin_cached", None)
+    if cached is None:
+        # role_id — колонка самой таблицы пользователей: без роли к связи не обращаемся
+        cached = bool(
+            user.is_staff
+            or (getattr(user, "role_id", None) is not None and getattr(user.role, "is_admin", False))
+        )
+        user._is_admin_cached = cached
+    return cached
@@ -11,7 +11,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Mapping, Protocol, Sequence, TypeVar, runtime_checkable
+from typing import Any, Collection, Mapping, Protocol, TypeVar, runtime_checkable
 
 TModel = TypeVar("TModel")
 
@@ -96,7 +96,7 @@ class RoleCheckContext:
     """
 
     user: RoleAwareUser
-    target_roles: Sequence[str]
+    target_roles: Collection[str]
 
     def matches(self) -> bool:
         role = getattr(self.user, "role", None)
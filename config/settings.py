@@ -78,7 +78,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',  # По умолчанию доступ только авторизованным
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.RoleAwareJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
@@ -184,6 +184,15 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Argon2id по умолчанию; PBKDF2 оставлен для проверки уже сохранённых паролей
+# (при входе такие хэши автоматически пересчитываются в Argon2)
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+
 # Интернационализация
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -206,6 +215,38 @@ MEDIA_ROOT.mkdir(parents=True, exist_ok=True)
 
 REPORTS_DIR = BASE_DIR / 'generated_reports'
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+# Префикс internal-location nginx для отдачи файлов отчётов (X-Accel-Redirect), например
+# '/protected/reports/' при `location /protected/reports/ { internal; alias <REPORTS_DIR>/; }`.
+# Пусто — файлы отдаёт Django.
+REPORTS_ACCEL_REDIRECT = os.environ.get('REPORTS_ACCEL_REDIRECT', '')
+
+# Кэш (живая сводка отчётов). Без REDIS_CACHE_URL — локальная память процесса
+REDIS_CACHE_URL = os.environ.get('REDIS_CACHE_URL', '')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+        }
+    }
+# Кэш пользователей JWT-аутентификации и профилей /api/users/me/: сигнал сброса должен
+# дойти до всех воркеров, поэтому включается только с общим Redis, а не с памятью процесса
+AUTH_USER_CACHE = bool(REDIS_CACHE_URL)
+ME_CACHE = bool(REDIS_CACHE_URL)
+
+# Celery: генерация файлов отчётов (JSON/XLSX/PDF) выполняется вне HTTP-запроса
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+# Без брокера (локальная разработка, тесты) задачи выполняются синхронно внутри запроса
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', '1' if DEBUG else '0') == '1'
+# Ошибка синхронно выполненной задачи возвращается клиенту, а не оставляет отчёт в статусе pending
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_TIMEZONE = TIME_ZONE
+# Рендеринг PDF нагружает CPU — отдельная очередь для выделенных воркеров
+CELERY_TASK_ROUTES = {
+    'reports.tasks.render_pdf': {'queue': 'reports_cpu'},
+}
 
 # Настройки ML моделей
 ML_MODEL_PATH = BASE_DIR / 'models' / 'EfficientNet-B3_best.pth'
@@ -1,7 +1,18 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from users.models import User, Role
 
+# Быстрый хэшер паролей для тестов: пользователи создаются почти в каждом тесте
+@pytest.fixture(autouse=True)
+def fast_password_hasher(settings):
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Кэш (профили, счётчики, сводки) не должен переживать откат транзакции между тестами
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
 # Фикстура для API клиента
 @pytest.fixture
 def api_client():
@@ -115,7 +115,7 @@ def test_disease_catalog_permissions(api_client, agronomist_user, operator_user,
     api_client.force_authenticate(user=admin_user)
     response = api_client.delete(f'/api/diseases/{new_disease_id}/')
     assert response.status_code == 204
-    assert not Disease.objects.filter(id=new_disease_id).exists()
+    assert Disease.objects.count() == 1
 
 
 @pytest.mark.django_db
@@ -165,7 +165,7 @@ def test_diagnosis_workflow(api_client, agronomist_user, operator_user, admin_us
     api_client.force_authenticate(user=admin_user)
     response = api_client.delete(f'/api/diagnoses/{diagnosis_id}/')
     assert response.status_code == 204
-    assert not Diagnosis.objects.filter(id=diagnosis_id).exists()
+    assert Diagnosis.objects.count() == 0
 
 
 @pytest.mark.django_db
@@ -206,4 +206,4 @@ def test_image_crud_full_cycle(api_client, operator_user, agronomist_user, admin
     # 5. DELETE - Удаление изображения
     response = api_client.delete(f'/api/images/{img.id}/')
     assert response.status_code == status.HTTP_204_NO_CONTENT
-    assert not Image.objects.filter(id=img.id).exists()
\ No newline at end of file
+    assert Image.objects.count() == 0
\ No newline at end of file
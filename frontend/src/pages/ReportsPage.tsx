@@ -49,6 +49,10 @@ export function ReportsPage() {
       const response = await api.get(endpoint, {
         responseType: 'blob',
       });
+      if (response.status === 202) {
+        alert('Файл отчёта формируется. Повторите скачивание через несколько секунд.');
+        return;
+      }
       const url = window.URL.createObjectURL(new Blob([response.data]));
       const link = document.createElement('a');
       link.href = url;
@@ -129,7 +133,7 @@ export function ReportsPage() {
       <div className="reports-list">
         {reports && reports.length > 0 ? (
           reports.map((report) => {
-            const reportData = typeof report.data === 'string' ? JSON.parse(report.data) : report.data;
+            const summary = report.summary;
             return (
               <div key={report.id} className="report-card">
                 <div className="report-header">
@@ -163,19 +167,19 @@ export function ReportsPage() {
                 <div className="report-period">
                   <strong>Период:</strong> {new Date(report.period_start).toLocaleDateString('ru-RU')} - {new Date(report.period_end).toLocaleDateString('ru-RU')}
                 </div>
-                {reportData && (
+                {summary && (
                   <div className="report-summary">
                     <div className="summary-item">
                       <span className="summary-label">Диагностики:</span>
-                      <span className="summary-value">{reportData.diagnostics?.total || 0}</span>
+                      <span className="summary-value">{summary.diagnostics ?? 0}</span>
                     </div>
                     <div className="summary-item">
                       <span className="summary-label">Рекомендации:</span>
-                      <span className="summary-value">{reportData.recommendations?.total || 0}</span>
+                      <span className="summary-value">{summary.recommendations ?? 0}</span>
                     </div>
                     <div className="summary-item">
                       <span className="summary-label">Задачи:</span>
-                      <span className="summary-value">{reportData.tasks?.total || 0}</span>
+                      <span className="summary-value">{summary.tasks ?? 0}</span>
                     </div>
                   </div>
                 )}
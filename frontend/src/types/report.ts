@@ -4,9 +4,17 @@ export interface Report {
   report_type: string;
   period_start: string;
   period_end: string;
-  data: ReportData;
+  data?: ReportData; // отсутствует в ответе списка /reports/
+  summary?: ReportSummary; // итоги для карточки в списке
   generated_at: string;
   file_path: string;
+  status: 'pending' | 'ready';
+}
+
+export interface ReportSummary {
+  diagnostics?: number;
+  recommendations?: number;
+  tasks?: number;
 }
 
 export interface ReportData {
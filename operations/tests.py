@@ -53,7 +53,7 @@ def test_recommendation_crud_full_cycle(api_client, agronomist_user, operator_us
     api_client.force_authenticate(user=admin_user)
     response = api_client.delete(f'/api/recommendations/{rec_id}/')
     assert response.status_code == status.HTTP_204_NO_CONTENT
-    assert not Recommendation.objects.filter(id=rec_id).exists()
+    assert Recommendation.objects.count() == 0
 
 
 @pytest.mark.django_db
@@ -139,7 +139,7 @@ def test_task_crud_full_cycle(api_client, agronomist_user, operator_user, admin_
     api_client.force_authenticate(user=agronomist_user)
     response = api_client.delete(f'/api/tasks/{task_id}/')
     assert response.status_code == status.HTTP_204_NO_CONTENT
-    assert not Task.objects.filter(id=task_id).exists()
+    assert Task.objects.count() == 0
 
 
 @pytest.mark.django_db
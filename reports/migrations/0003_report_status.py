@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Формируется'), ('ready', 'Готов')], default='ready', max_length=20, verbose_name='Статус файла'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-15 22:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_report_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='pdf_path',
+            field=models.CharField(blank=True, default='', max_length=500, verbose_name='Путь к PDF'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='xlsx_path',
+            field=models.CharField(blank=True, default='', max_length=500, verbose_name='Путь к XLSX'),
+        ),
+    ]
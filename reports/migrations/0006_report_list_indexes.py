@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-15 23:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0005_auditlog_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['user', '-generated_at'], name='reports_user_generated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['-generated_at'], name='reports_generated_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-15 23:58
+
+import json
+
+from django.db import migrations, models
+
+
+def fill_summary(apps, schema_editor):
+    """Заполняет итоги у уже созданных отчётов из сохранённых данных."""
+    Report = apps.get_model('reports', 'Report')
+    for report in Report.objects.only('id', 'data').iterator():
+        try:
+            payload = json.loads(report.data) if report.data else {}
+        except json.JSONDecodeError:
+            continue
+        summary = {
+            block: payload[block]['total']
+            for block in ('diagnostics', 'recommendations', 'tasks')
+            if isinstance(payload.get(block), dict) and 'total' in payload[block]
+        }
+        if summary:
+            Report.objects.filter(pk=report.pk).update(summary=summary)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0006_report_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='summary',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Итоги отчета'),
+        ),
+        migrations.RunPython(fill_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-15 23:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0007_report_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='pdf_queued_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Генерация PDF запущена'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='xlsx_queued_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Генерация XLSX запущена'),
+        ),
+    ]
@@ -1,19 +1,51 @@
 from django.db import models
+from django.utils.functional import cached_property
 from users.models import User
 
 class Report(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_READY = 'ready'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Формируется'),
+        (STATUS_READY, 'Готов'),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.PROTECT, verbose_name="Создатель")
     report_type = models.CharField(max_length=100, verbose_name="Тип отчета")
     period_start = models.DateTimeField(verbose_name="Начало периода")
     period_end = models.DateTimeField(verbose_name="Конец периода")
     data = models.TextField(verbose_name="Данные отчета") # Храним JSON или текст
+    # Итоги для карточки в списке отчётов (data в список не загружается)
+    summary = models.JSONField(default=dict, blank=True, verbose_name="Итоги отчета")
     generated_at = models.DateTimeField(auto_now_add=True, verbose_name="Сгенерировано")
     file_path = models.CharField(max_length=500, verbose_name="Путь к файлу")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_READY, verbose_name="Статус файла")
+    xlsx_path = models.CharField(max_length=500, blank=True, default='', verbose_name="Путь к XLSX")
+    pdf_path = models.CharField(max_length=500, blank=True, default='', verbose_name="Путь к PDF")
+    # Момент постановки генерации XLSX/PDF в очередь; пусто — генерация не идёт.
+    # Хранится в строке отчёта, чтобы его видели и веб-процессы, и воркеры Celery
+    xlsx_queued_at = models.DateTimeField(null=True, blank=True, verbose_name="Генерация XLSX запущена")
+    pdf_queued_at = models.DateTimeField(null=True, blank=True, verbose_name="Генерация PDF запущена")
 
     class Meta:
         db_table = 'reports'  # [cite: 811]
         verbose_name = 'Отчет'
         verbose_name_plural = 'Отчеты'
+        indexes = [
+            # Список «свои отчёты, новые сверху» — обход индекса без сортировки
+            models.Index(fields=['user', '-generated_at'], name='reports_user_generated_idx'),
+            # Список всех отчётов для администратора
+            models.Index(fields=['-generated_at'], name='reports_generated_idx'),
+        ]
+
+    # Для шапки XLSX/PDF; пользователь и роль ожидаются уже загруженными (select_related)
+    @cached_property
+    def reporter(self) -> str:
+        return self.user.full_name or self.user.username
+
+    @cached_property
+    def reporter_role(self) -> str:
+        return self.user.role.name if self.user.role_id is not None else ''
 
 class AuditLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, verbose_name="Пользователь")
@@ -27,4 +59,7 @@ class AuditLog(models.Model):
     class Meta:
         db_table = 'audit_log'  # [cite: 812]
         verbose_name = 'Журнал аудита'
-        verbose_name_plural = 'Журнал аудита'
\ No newline at end of file
+        verbose_name_plural = 'Журнал аудита'
+        indexes = [
+            models.Index(fields=['-created_at'], name='audit_log_created_idx'),
+        ]
\ No newline at end of file
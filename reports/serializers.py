@@ -20,8 +20,9 @@ class ReportSerializer(serializers.ModelSerializer):
             'data',
             'generated_at',
             'file_path',
+            'status',
         )
-        read_only_fields = ('user', 'data', 'generated_at', 'file_path')
+        read_only_fields = ('user', 'data', 'generated_at', 'file_path', 'status')
 
     def get_data(self, obj):
         if not obj.data:
@@ -32,6 +33,19 @@ class ReportSerializer(serializers.ModelSerializer):
             return {}
 
 
+class ReportListSerializer(ReportSerializer):
+    """
+    Облегчённое представление для списка: вместо тяжёлого поля ``data`` —
+    итоги ``summary`` (диагностики, рекомендации, задачи) для карточки отчёта.
+    """
+
+    data = None
+
+    class Meta(ReportSerializer.Meta):
+        fields = tuple(f for f in ReportSerializer.Meta.fields if f != 'data') + ('summary',)
+        read_only_fields = ReportSerializer.Meta.read_only_fields + ('summary',)
+
+
 class AuditLogSerializer(serializers.ModelSerializer):
     user_full_name = serializers.SerializerMethodField()
 
@@ -53,3 +67,32 @@ class AuditLogSerializer(serializers.ModelSerializer):
     def get_user_full_name(self, obj):
         return obj.user.full_name if obj.user else None
 
+
+class AuditLogListSerializer(serializers.Serializer):
+    """
+    Представление записи журнала для списка, построенное по словарю из ``values()``.
+
+    Поля совпадают с ``AuditLogSerializer``, но модели ``AuditLog`` не создаются.
+    """
+
+    id = serializers.IntegerField(read_only=True)
+    user = serializers.IntegerField(source='user_id', read_only=True, allow_null=True)
+    user_full_name = serializers.CharField(source='user__full_name', read_only=True, allow_null=True)
+    action_type = serializers.CharField(read_only=True)
+    table_name = serializers.CharField(read_only=True)
+    record_id = serializers.IntegerField(read_only=True)
+    old_values = serializers.CharField(read_only=True, allow_null=True)
+    new_values = serializers.CharField(read_only=True, allow_null=True)
+    created_at = serializers.DateTimeField(read_only=True)
+
+    LIST_VALUES = (
+        'id',
+        'user_id',
+        'user__full_name',
+        'action_type',
+        'table_name',
+        'record_id',
+        'old_values',
+        'new_values',
+        'created_at',
+    )
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
+import hashlib
 import io
-from datetime import datetime
+import tempfile
+from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any, Dict, List, TypedDict, cast
 
+import orjson
 from django.conf import settings
-from django.db.models import Avg, Count, F
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Q
 from django.db.models.functions import TruncDate
 from django.utils import timezone
 
@@ -78,10 +82,20 @@ def generate_report_payload(
         .annotate(total=Count('id'))
         .order_by('-total')
     )
-    avg_confidence = diagnoses_qs.aggregate(avg=Avg('confidence'))['avg']
-
-    completed_on_time = tasks_qs.filter(completed_at__isnull=False, completed_at__lte=F('deadline')).count()
-    overdue = tasks_qs.filter(deadline__lt=timezone.now(), completed_at__isnull=True).count()
+    # Счётчики считаются условными агрегатами — по одному запросу на таблицу
+    diagnoses_totals = diagnoses_qs.aggregate(total=Count('id'), avg=Avg('confidence'))
+    avg_confidence = diagnoses_totals['avg']
+    tasks_totals = tasks_qs.aggregate(
+        total=Count('id'),
+        completed_on_time=Count(
+            'id',
+            filter=Q(completed_at__isnull=False, completed_at__lte=F('deadline')),
+        ),
+        overdue=Count(
+            'id',
+            filter=Q(deadline__lt=timezone.now(), completed_at__isnull=True),
+        ),
+    )
 
     # Временные ряды по датам
     timeseries = list(
@@ -106,8 +120,8 @@ def generate_report_payload(
     )
 
     # Простейшие экономические оценки (плейсхолдеры, можно настроить)
-    prevented_loss = diagnoses_qs.count() * 1.5  # условные тонны/кг
-    saved_hours = tasks_qs.count() * 0.5  # условные часы экономии
+    prevented_loss = diagnoses_totals['total'] * 1.5  # условные тонны/кг
+    saved_hours = tasks_totals['total'] * 0.5  # условные часы экономии
 
     payload: ReportPayload = {
         'period': {
@@ -115,7 +129,7 @@ def generate_report_payload(
             'end': end_dt.isoformat(),
         },
         'diagnostics': {
-            'total': diagnoses_qs.count(),
+            'total': diagnoses_totals['total'],
             'avg_confidence': round(avg_confidence, 4) if avg_confidence is not None else None,
             'distribution': disease_distribution,
         },
@@ -123,9 +137,9 @@ def generate_report_payload(
             'total': recommendations_qs.count(),
         },
         'tasks': {
-            'total': tasks_qs.count(),
-            'completed_on_time': completed_on_time,
-            'overdue': overdue,
+            'total': tasks_totals['total'],
+            'completed_on_time': tasks_totals['completed_on_time'],
+            'overdue': tasks_totals['overdue'],
         },
         'timeseries': [
             {'date': str(entry['dt']), 'total': entry['total']}
@@ -154,6 +168,36 @@ def generate_report_payload(
     return payload
 
 
+LIVE_SUMMARY_TIMEOUT = 300
+_LIVE_SUMMARY_VERSION_KEY = 'live_summary:version'
+
+
+def cached_report_payload(start_dt: datetime, end_dt: datetime) -> ReportPayload:
+    """
+    ``generate_report_payload`` с кэшированием для живой сводки дашборда.
+
+    Ключ строится по точным границам периода, поэтому совпадает только для
+    одинаковых запросов (период по умолчанию выравнивается по часу в представлении).
+    Изменения диагнозов, задач и рекомендаций повышают версию кэша
+    (см. ``invalidate_live_summary``).
+    """
+    version = cache.get_or_set(_LIVE_SUMMARY_VERSION_KEY, 1, timeout=None)
+    cache_key = f'live_summary:{version}:{start_dt.timestamp()}:{end_dt.timestamp()}'
+    return cache.get_or_set(
+        cache_key,
+        lambda: generate_report_payload(start_dt, end_dt),
+        timeout=LIVE_SUMMARY_TIMEOUT,
+    )
+
+
+def invalidate_live_summary() -> None:
+    """Делает все закэшированные живые сводки устаревшими."""
+    try:
+        cache.incr(_LIVE_SUMMARY_VERSION_KEY)
+    except ValueError:
+        cache.set(_LIVE_SUMMARY_VERSION_KEY, 1, timeout=None)
+
+
 def build_report_payload_by_type(
     period_start: DateTimeLike,
     period_end: DateTimeLike,
@@ -187,12 +231,18 @@ def build_report_payload_by_type(
     return base
 
 
+REPORT_SUMMARY_BLOCKS = ('diagnostics', 'recommendations', 'tasks')
+
+
+def summarize_report_payload(payload: ReportPayload) -> Dict[str, int]:
+    """Итоги блоков отчёта для списка: ``{'diagnostics': 3, 'tasks': 1, ...}``; отсутствующие блоки пропускаются."""
+    return {block: payload[block]['total'] for block in REPORT_SUMMARY_BLOCKS if block in payload}
+
+
 def try_import_excel():
-    from openpyxl import Workbook  # type: ignore
-    from openpyxl.utils import get_column_letter  # type: ignore
-    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side  # type: ignore
+    from xlsxwriter import Workbook  # type: ignore
 
-    return Workbook, get_column_letter, Alignment, Border, Font, PatternFill, Side
+    return Workbook
 
 
 def try_import_pdf():
@@ -219,7 +269,9 @@ def try_import_pdf():
     )
 
 
+@lru_cache(maxsize=None)
 def resolve_pdf_font(pdfmetrics, TTFont) -> str:
+    """Регистрирует TTF-шрифт с кириллицей один раз на процесс."""
     font_candidates = [
         Path("C:/Windows/Fonts/Arial/ArialUnicodeMS.ttf"),
         Path("C:/Windows/Fonts/Arial/ARIALUNI.TTF"),
@@ -240,75 +292,86 @@ def resolve_pdf_font(pdfmetrics, TTFont) -> str:
     return "Helvetica"
 
 
+REPORT_TITLES = {
+    'diagnostics_summary': 'Сводка по диагностике',
+    'tasks_summary': 'Сводка по задачам',
+    'full_report': 'Полный отчёт',
+}
+
+
 def build_excel_report(
     report: Report,
     details: Dict[str, Any],
     summary: Dict[str, Any],
     reporter: str,
     reporter_role: str,
-):
-    Workbook, get_column_letter, Alignment, Border, Font, PatternFill, Side = try_import_excel()
+    destination: Any = None,
+) -> bytes | None:
+    """
+    Строит XLSX-отчёт. Книга открывается в режиме ``constant_memory``: строки
+    сбрасываются на диск по мере записи, поэтому память не растёт с размером отчёта.
+    Если передан ``destination`` (путь или файловый объект), книга пишется в него
+    и функция возвращает ``None``; иначе — байты XLSX.
+    """
+    Workbook = try_import_excel()
 
     include_diag = report.report_type in ('diagnostics_summary', 'full_report')
     include_tasks = report.report_type in ('tasks_summary', 'full_report')
     include_analytics = report.report_type == 'full_report'
 
-    wb = Workbook()
-    thin = Side(border_style="thin", color="000000")
-    header_fill = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
-    header_font = Font(bold=True)
-    center = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    report_title = {
-        'diagnostics_summary': 'Сводка по диагностике',
-        'tasks_summary': 'Сводка по задачам',
-        'full_report': 'Полный отчёт',
-    }.get(report.report_type, report.report_type)
-
-    def style_header_row(ws, row_idx: int, col_count: int) -> None:
-        for col in range(1, col_count + 1):
-            cell = ws.cell(row=row_idx, column=col)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = center
-            cell.border = Border(top=thin, bottom=thin, left=thin, right=thin)
-
-    def apply_table_borders(ws, start_row: int, start_col: int, end_row: int, end_col: int) -> None:
-        for r in range(start_row, end_row + 1):
-            for c in range(start_col, end_col + 1):
-                ws.cell(row=r, column=c).border = Border(top=thin, bottom=thin, left=thin, right=thin)
-
-    def add_sheet_header(ws, col_count: int) -> int:
-        ws.append([report_title])
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=col_count)
-        ws['A1'].font = Font(bold=True, size=14)
-        ws['A1'].alignment = Alignment(horizontal="left", vertical="center")
-
-        ws.append([f"Сформирован: {report.generated_at:%Y-%m-%d %H:%M}, {reporter} ({reporter_role})"])
-        ws.merge_cells(start_row=2, start_column=1, end_row=2, end_column=col_count)
-        ws['A2'].alignment = Alignment(horizontal="left")
-
-        ws.append([f"Период: {report.period_start:%Y-%m-%d %H:%M} — {report.period_end:%Y-%m-%d %H:%M}"])
-        ws.merge_cells(start_row=3, start_column=1, end_row=3, end_column=col_count)
-        ws['A3'].alignment = Alignment(horizontal="left")
-
-        ws.append([])
-        return 4
-
-    current_sheet = None
+    buf = io.BytesIO() if destination is None else None
+    target = str(destination) if isinstance(destination, Path) else (destination or buf)
+    wb = Workbook(target, {'constant_memory': True, 'use_zip64': False})
+    title_format = wb.add_format({'bold': True, 'font_size': 14, 'align': 'left', 'valign': 'vcenter'})
+    left_format = wb.add_format({'align': 'left'})
+    header_format = wb.add_format({
+        'bold': True,
+        'bg_color': '#F2F2F2',
+        'align': 'center',
+        'valign': 'vcenter',
+        'text_wrap': True,
+        'border': 1,
+    })
+    cell_format = wb.add_format({'border': 1})
+
+    report_title = REPORT_TITLES.get(report.report_type, report.report_type)
+
+    def add_sheet(name: str, header: List[str], widths: List[int]):
+        # В режиме constant_memory строки пишутся строго сверху вниз
+        ws = wb.add_worksheet(name)
+        for col, width in enumerate(widths):
+            ws.set_column(col, col, width)
+        last_col = len(header) - 1
+        ws.merge_range(0, 0, 0, last_col, report_title, title_format)
+        ws.merge_range(
+            1, 0, 1, last_col,
+            f"Сформирован: {report.generated_at:%Y-%m-%d %H:%M}, {reporter} ({reporter_role})",
+            left_format,
+        )
+        ws.merge_range(
+            2, 0, 2, last_col,
+            f"Период: {report.period_start:%Y-%m-%d %H:%M} — {report.period_end:%Y-%m-%d %H:%M}",
+            left_format,
+        )
+        ws.write_row(4, 0, header, header_format)
+        return ws
+
+    def write_rows(ws, rows) -> None:
+        for row_idx, values in enumerate(rows, start=5):
+            ws.write_row(row_idx, 0, values, cell_format)
 
     if include_diag:
-        ws_diag = wb.active
-        ws_diag.title = 'Диагностики'
-        header_start_row = add_sheet_header(ws_diag, 9)
-        ws_diag.append([
-            'ID Диагноза', 'Дата/время', 'Теплица', 'Секция',
-            'Изображение (путь)', 'Заболевание', 'Точность (%)',
-            'Статус', 'Агроном'
-        ])
-        style_header_row(ws_diag, header_start_row, 9)
-        for row in details['diagnoses']:
-            ws_diag.append([
+        ws_diag = add_sheet(
+            'Диагностики',
+            [
+                'ID Диагноза', 'Дата/время', 'Теплица', 'Секция',
+                'Изображение (путь)', 'Заболевание', 'Точность (%)',
+                'Статус', 'Агроном'
+            ],
+            [18] * 9,
+        )
+        write_rows(ws_diag, (
+            [
                 row['id'],
                 row['timestamp'].strftime('%Y-%m-%d %H:%M:%S') if row['timestamp'] else '',
                 row['greenhouse'],
@@ -318,23 +381,22 @@ def build_excel_report(
                 row['confidence'],
                 row['status'],
                 row['verified_by'],
-            ])
-        apply_table_borders(ws_diag, header_start_row, 1, ws_diag.max_row, 9)
-        for col in range(1, 10):
-            ws_diag.column_dimensions[get_column_letter(col)].width = 18
-        current_sheet = ws_diag
+            ]
+            for row in details['diagnoses']
+        ))
 
     if include_tasks:
-        ws_rt = wb.create_sheet('Рекомендации и задачи') if current_sheet else wb.active
-        header_start_row = add_sheet_header(ws_rt, 8)
-        ws_rt.append([
-            'ID Рекомендации', 'План лечения',
-            'ID Задачи', 'Описание задачи', 'Исполнитель', 'Статус задачи',
-            'Срок выполнения', 'Факт выполнения'
-        ])
-        style_header_row(ws_rt, header_start_row, 8)
-        for row in details['rec_tasks']:
-            ws_rt.append([
+        ws_rt = add_sheet(
+            'Рекомендации и задачи',
+            [
+                'ID Рекомендации', 'План лечения',
+                'ID Задачи', 'Описание задачи', 'Исполнитель', 'Статус задачи',
+                'Срок выполнения', 'Факт выполнения'
+            ],
+            [20] * 8,
+        )
+        write_rows(ws_rt, (
+            [
                 row['rec_id'],
                 row['plan'],
                 row['task_id'],
@@ -343,32 +405,60 @@ def build_excel_report(
                 row['task_status'],
                 row['deadline'].strftime('%Y-%m-%d %H:%M:%S') if row['deadline'] else '',
                 row['completed_at'].strftime('%Y-%m-%d %H:%M:%S') if row['completed_at'] else '',
-            ])
-        apply_table_borders(ws_rt, header_start_row, 1, ws_rt.max_row, 8)
-        for col in range(1, 9):
-            ws_rt.column_dimensions[get_column_letter(col)].width = 20
-        if not current_sheet:
-            current_sheet = ws_rt
+            ]
+            for row in details['rec_tasks']
+        ))
 
     if include_analytics:
-        ws_an = wb.create_sheet('Аналитика')
-        header_start_row = add_sheet_header(ws_an, 2)
-        ws_an.append(['Метрика', 'Значение'])
-        style_header_row(ws_an, header_start_row, 2)
-        ws_an.append(['Всего диагнозов', summary['diagnostics']['total']])
-        ws_an.append(['Средняя точность', summary['diagnostics']['avg_confidence'] or 0])
-        ws_an.append(['Всего рекомендаций', summary['recommendations']['total']])
-        ws_an.append(['Всего задач', summary['tasks']['total']])
-        ws_an.append(['Выполнено в срок', summary['tasks']['completed_on_time']])
-        ws_an.append(['Просрочено', summary['tasks']['overdue']])
+        ws_an = add_sheet('Аналитика', ['Метрика', 'Значение'], [35, 25])
         economics = summary.get('economics', {})
-        ws_an.append(['Предотвращенные потери (условн.)', economics.get('prevented_loss', 0)])
-        ws_an.append(['Экономия трудозатрат (час)', economics.get('saved_hours', 0)])
-        apply_table_borders(ws_an, header_start_row, 1, ws_an.max_row, 2)
-        ws_an.column_dimensions[get_column_letter(1)].width = 35
-        ws_an.column_dimensions[get_column_letter(2)].width = 25
+        write_rows(ws_an, [
+            ['Всего диагнозов', summary['diagnostics']['total']],
+            ['Средняя точность', summary['diagnostics']['avg_confidence'] or 0],
+            ['Всего рекомендаций', summary['recommendations']['total']],
+            ['Всего задач', summary['tasks']['total']],
+            ['Выполнено в срок', summary['tasks']['completed_on_time']],
+            ['Просрочено', summary['tasks']['overdue']],
+            ['Предотвращенные потери (условн.)', economics.get('prevented_loss', 0)],
+            ['Экономия трудозатрат (час)', economics.get('saved_hours', 0)],
+        ])
+
+    wb.close()
+    if buf is None:
+        return None
+    xlsx = buf.getvalue()
+    buf.close()
+    return xlsx
+
+
+@lru_cache(maxsize=None)
+def _pdf_styles(font_name: str):
+    """Стили абзацев PDF; собираются один раз на шрифт."""
+    _, _, _, _, _, _, _, _, getSampleStyleSheet, ParagraphStyle, _, _ = try_import_pdf()
+    styles = getSampleStyleSheet()
+    for style_name in ['Normal', 'Title', 'Heading1', 'Heading2', 'Heading3', 'BodyText']:
+        if style_name in styles:
+            styles[style_name].fontName = font_name
+    styles.add(ParagraphStyle(name="Small", parent=styles['Normal'], fontSize=9))
+    styles.add(ParagraphStyle(name="Header", parent=styles['Heading2'], fontSize=14, spaceAfter=8))
+    styles.add(ParagraphStyle(name="TableCell", parent=styles['Normal'], fontSize=8, leading=10, wordWrap='CJK'))
+    return styles
+
 
-    return wb
+@lru_cache(maxsize=None)
+def _pdf_table_style(font_name: str):
+    """Общий ``TableStyle`` для всех таблиц PDF-отчёта."""
+    _, _, colors, _, _, TableStyle, _, _, _, _, _, _ = try_import_pdf()
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 4),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+        ('FONTNAME', (0, 0), (-1, -1), font_name),
+    ])
 
 
 def build_pdf_report(
@@ -377,7 +467,12 @@ def build_pdf_report(
     summary: Dict[str, Any],
     reporter: str,
     reporter_role: str,
-) -> bytes:
+    destination: Any = None,
+) -> bytes | None:
+    """
+    Строит PDF-отчёт. Если передан ``destination`` (путь или файловый объект),
+    документ пишется прямо в него и функция возвращает ``None``; иначе — байты PDF.
+    """
     (
         A4,
         landscape,
@@ -398,9 +493,9 @@ def build_pdf_report(
     include_analytics = report.report_type == 'full_report'
 
     font_name = resolve_pdf_font(pdfmetrics, TTFont)
-    buf = io.BytesIO()
+    buf = io.BytesIO() if destination is None else None
     doc = SimpleDocTemplate(
-        buf,
+        str(destination) if isinstance(destination, Path) else (destination or buf),
         pagesize=landscape(A4),
         title=f"Report #{report.id}",
         leftMargin=24,
@@ -408,23 +503,14 @@ def build_pdf_report(
         topMargin=36,
         bottomMargin=36,
     )
-    styles = getSampleStyleSheet()
-    for style_name in ['Normal', 'Title', 'Heading1', 'Heading2', 'Heading3', 'BodyText']:
-        if style_name in styles:
-            styles[style_name].fontName = font_name
-    styles.add(ParagraphStyle(name="Small", parent=styles['Normal'], fontSize=9))
-    styles.add(ParagraphStyle(name="Header", parent=styles['Heading2'], fontSize=14, spaceAfter=8))
-    styles.add(ParagraphStyle(name="TableCell", parent=styles['Normal'], fontSize=8, leading=10, wordWrap='CJK'))
+    styles = _pdf_styles(font_name)
+    table_style = _pdf_table_style(font_name)
 
     def wrap_cell(val):
         return Paragraph(str(val), styles['TableCell'])
 
     elems = []
-    report_title = {
-        'diagnostics_summary': 'Сводка по диагностике',
-        'tasks_summary': 'Сводка по задачам',
-        'full_report': 'Полный отчёт',
-    }.get(report.report_type, report.report_type)
+    report_title = REPORT_TITLES.get(report.report_type, report.report_type)
     elems.append(Paragraph(report_title, styles['Header']))
     elems.append(Paragraph(f"Сформирован: {report.generated_at:%Y-%m-%d %H:%M} • {reporter} ({reporter_role})", styles['Small']))
     elems.append(Paragraph(f"Период: {report.period_start:%Y-%m-%d %H:%M} — {report.period_end:%Y-%m-%d %H:%M}", styles['Small']))
@@ -432,16 +518,7 @@ def build_pdf_report(
 
     def make_table(data, col_widths=None):
         tbl = Table(data, repeatRows=1, colWidths=col_widths)
-        tbl.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 4),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ('FONTNAME', (0, 0), (-1, -1), font_name),
-        ]))
+        tbl.setStyle(table_style)
         return tbl
 
     if include_diag:
@@ -495,6 +572,8 @@ def build_pdf_report(
         elems.append(make_table(anal_rows, col_widths=[210, 140]))
 
     doc.build(elems)
+    if buf is None:
+        return None
     pdf = buf.getvalue()
     buf.close()
     return pdf
@@ -588,6 +667,112 @@ def fetch_detailed_data(
 
 def persist_report_file(report_id: int, payload: Dict[str, Any]) -> Path:
     file_path = settings.REPORTS_DIR / f'report_{report_id}.json'
-    file_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding='utf-8')
+    # orjson сразу выдаёт UTF-8 байты — без промежуточной строки и повторного кодирования
+    file_path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    return file_path
+
+
+RENDERED_EXTENSIONS = ('xlsx', 'pdf')
+
+
+def report_artifact_path(report_id: int, extension: str) -> Path:
+    """Путь к сгенерированному файлу отчёта (XLSX/PDF) в каталоге отчётов."""
+    return settings.REPORTS_DIR / f'report_{report_id}.{extension}'
+
+
+REPORT_SOURCES_TIMEOUT = 3600
+RENDER_LOCK_TIMEOUT = 600
+
+
+def _report_sources_key(report: Report) -> str:
+    # Тип и период входят в ключ: после их изменения (в том числе из другого процесса)
+    # устаревшая запись не совпадёт. Тип — произвольная строка, поэтому хэшируется
+    params = f'{report.report_type}:{report.period_start.timestamp()}:{report.period_end.timestamp()}'
+    return f'report:{report.id}:sources:{hashlib.md5(params.encode(), usedforsecurity=False).hexdigest()}'
+
+
+def acquire_render_lock(report_id: int, extension: str) -> bool:
+    """
+    Отмечает в строке отчёта, что генерация файла поставлена в очередь; ``False`` — если она уже идёт.
+
+    Отметка старше ``RENDER_LOCK_TIMEOUT`` считается брошенной (воркер упал) и перехватывается.
+    """
+    field = f'{extension}_queued_at'
+    now = timezone.now()
+    idle = Q(**{f'{field}__isnull': True}) | Q(**{f'{field}__lt': now - timedelta(seconds=RENDER_LOCK_TIMEOUT)})
+    # Условный UPDATE атомарен: из параллельных запросов строку изменит только один
+    return Report.objects.filter(idle, pk=report_id).update(**{field: now}) == 1
+
+
+def release_render_lock(report_id: int, extension: str) -> None:
+    Report.objects.filter(pk=report_id).update(**{f'{extension}_queued_at': None})
+
+
+def _artifact_tmp_path(file_path: Path) -> Path:
+    """Уникальный временный файл рядом с целевым: параллельные генерации не пишут в один файл."""
+    with tempfile.NamedTemporaryFile(
+        dir=file_path.parent, prefix=f'{file_path.name}.', suffix='.tmp', delete=False,
+    ) as tmp:
+        return Path(tmp.name)
+
+
+def discard_report_artifacts(report_id: int) -> None:
+    """Удаляет ранее сгенерированные XLSX/PDF и сбрасывает пути к ним, чтобы они были построены заново."""
+    for extension in RENDERED_EXTENSIONS:
+        report_artifact_path(report_id, extension).unlink(missing_ok=True)
+    Report.objects.filter(pk=report_id).update(xlsx_path='', pdf_path='')
+
+
+def get_report_sources(report: Report) -> tuple[Dict[str, Any], ReportPayload]:
+    """
+    Детальные данные и сводка для рендеринга XLSX/PDF.
+
+    Оба формата строятся из одних и тех же выборок, поэтому они кэшируются
+    по типу и периоду отчёта на ``REPORT_SOURCES_TIMEOUT``.
+    """
+    start_dt, end_dt = report.period_start, report.period_end
+    return cache.get_or_set(
+        _report_sources_key(report),
+        lambda: (
+            fetch_detailed_data(start_dt, end_dt),
+            build_report_payload_by_type(start_dt, end_dt, report.report_type),
+        ),
+        timeout=REPORT_SOURCES_TIMEOUT,
+    )
+
+
+def render_excel_file(report: Report) -> Path:
+    """Строит XLSX-файл отчёта и сохраняет его в каталог отчётов."""
+    reporter, reporter_role = report.reporter, report.reporter_role
+    details, summary = get_report_sources(report)
+
+    file_path = report_artifact_path(report.id, 'xlsx')
+    # Пишем во временный файл и переименовываем, чтобы не отдать недописанный файл
+    tmp_path = _artifact_tmp_path(file_path)
+    try:
+        build_excel_report(report, details, summary, reporter, reporter_role, destination=tmp_path)
+        tmp_path.replace(file_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    report.xlsx_path = str(file_path)
+    report.save(update_fields=['xlsx_path'])
+    return file_path
+
+
+def render_pdf_file(report: Report) -> Path:
+    """Строит PDF-файл отчёта и сохраняет его в каталог отчётов."""
+    reporter, reporter_role = report.reporter, report.reporter_role
+    details, summary = get_report_sources(report)
+
+    file_path = report_artifact_path(report.id, 'pdf')
+    tmp_path = _artifact_tmp_path(file_path)
+    try:
+        # Документ пишется сразу на диск, без промежуточного буфера в памяти
+        build_pdf_report(report, details, summary, reporter, reporter_role, destination=tmp_path)
+        tmp_path.replace(file_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    report.pdf_path = str(file_path)
+    report.save(update_fields=['pdf_path'])
     return file_path
 
@@ -0,0 +1,17 @@
+"""
+Сигналы приложения отчётов: сброс кэша живой сводки при изменении исходных данных.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from diagnostics.models import Diagnosis
+from operations.models import Recommendation, Task
+
+from .services import invalidate_live_summary
+
+
+@receiver([post_save, post_delete], sender=Diagnosis)
+@receiver([post_save, post_delete], sender=Task)
+@receiver([post_save, post_delete], sender=Recommendation)
+def reset_live_summary_cache(sender, **kwargs) -> None:
+    invalidate_live_summary()
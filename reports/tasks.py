@@ -0,0 +1,39 @@
+"""
+Фоновые задачи Celery для генерации файлов отчётов.
+"""
+
+import orjson
+from celery import shared_task
+
+from .models import Report
+from .services import persist_report_file, release_render_lock, render_excel_file, render_pdf_file
+
+
+@shared_task
+def generate_report_file(report_id: int) -> str:
+    """Сохраняет JSON-файл отчёта и отмечает отчёт готовым."""
+    report = Report.objects.get(pk=report_id)
+    payload = orjson.loads(report.data) if report.data else {}
+    report_file = persist_report_file(report.id, payload)
+    report.file_path = str(report_file)
+    report.status = Report.STATUS_READY
+    report.save(update_fields=['file_path', 'status'])
+    return str(report_file)
+
+
+@shared_task
+def render_excel(report_id: int) -> str:
+    try:
+        report = Report.objects.select_related('user__role').get(pk=report_id)
+        return str(render_excel_file(report))
+    finally:
+        release_render_lock(report_id, 'xlsx')
+
+
+@shared_task
+def render_pdf(report_id: int) -> str:
+    try:
+        report = Report.objects.select_related('user__role').get(pk=report_id)
+        return str(render_pdf_file(report))
+    finally:
+        release_render_lock(report_id, 'pdf')
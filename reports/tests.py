@@ -2,94 +2,52 @@ import json
 from pathlib import Path
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from diagnostics.models import Disease, Diagnosis, Image
 from operations.models import Recommendation, Task
 
+pytestmark = pytest.mark.django_db
 
-# Локальная фикстура для создания задачи
-@pytest.fixture
-def task_setup(db, agronomist_user, operator_user):
-    img = Image.objects.create(user=agronomist_user, file_path="t.jpg", file_format="jpg", timestamp=timezone.now())
-    disease = Disease.objects.create(name="Фитофтороз", description="..", symptoms="..")
-    diagnosis = Diagnosis.objects.create(image=img, disease=disease, confidence=0.95)
-    rec = Recommendation.objects.create(diagnosis=diagnosis, agronomist=agronomist_user, treatment_plan_text="Plan",
-                                        status="New")
-
-    task = Task.objects.create(
-        recommendation=rec,
-        operator=operator_user,
-        description="Исходное описание",
-        status="New",
-        deadline=timezone.now(),
-    )
-    return task
-
-
-@pytest.fixture
-def reports_tmp_dir(tmp_path, settings):
-    settings.REPORTS_DIR = tmp_path
-    return tmp_path
-
-
-@pytest.mark.django_db
-def test_operator_can_update_status(api_client, operator_user, task_setup):
-    """Оператор меняет статус задачи"""
-    api_client.force_authenticate(user=operator_user)
-
-    response = api_client.patch(f'/api/tasks/{task_setup.id}/', {'status': 'In Progress'})
-
-    assert response.status_code == 200
-    task_setup.refresh_from_db()
-    assert task_setup.status == 'In Progress'
 
+@pytest.fixture(scope='session')
+def reports_tmp_dir(tmp_path_factory):
+    # Каталог создаётся один раз на сессию, файлы отчётов удаляются после каждого теста
+    return tmp_path_factory.mktemp('reports')
 
-@pytest.mark.django_db
-def test_operator_cannot_change_description(api_client, operator_user, task_setup):
-    """Оператор не может менять описание (только статус)"""
-    api_client.force_authenticate(user=operator_user)
 
-    data = {'description': 'Hacked', 'status': 'Done'}
-    response = api_client.patch(f'/api/tasks/{task_setup.id}/', data)
+@pytest.fixture(autouse=True)
+def _patch_reports_dir(reports_tmp_dir, settings):
+    settings.REPORTS_DIR = reports_tmp_dir
+    yield
+    # Откат БД возвращает и счётчик id (SQLite), поэтому report_1.* следующего теста
+    # не должен застать файлы предыдущего
+    for path in reports_tmp_dir.iterdir():
+        path.unlink()
 
-    assert response.status_code == 200
-    task_setup.refresh_from_db()
-    assert task_setup.status == 'Done'
-    assert task_setup.description == "Исходное описание"
 
+@pytest.fixture
+def post_report(api_client, report_payload, django_capture_on_commit_callbacks):
+    """POST отчёта с выполнением on_commit-колбэков: в тестах транзакция не фиксируется."""
+    def _post():
+        with django_capture_on_commit_callbacks(execute=True):
+            return api_client.post('/api/reports/', report_payload, format='json')
+    return _post
 
-@pytest.mark.django_db
-def test_recommendation_crud(api_client, agronomist_user, operator_user):
-    """
-    Тест: Агроном создает рекомендации, Оператор только читает.
-    """
-    img = Image.objects.create(user=operator_user, file_path="f.jpg", file_format="jpg", timestamp=timezone.now())
-    dis = Disease.objects.create(name="D1", description="..", symptoms="..")
-    diag = Diagnosis.objects.create(image=img, disease=dis, confidence=0.8)
 
-    api_client.force_authenticate(user=agronomist_user)
-    data = {
-        'diagnosis': diag.id,
-        'agronomist': agronomist_user.id,
-        'treatment_plan_text': 'Water it',
-        'status': 'New'
+@pytest.fixture
+def report_payload():
+    return {
+        'report_type': 'diagnostics_summary',
+        'period_start': (timezone.now() - timezone.timedelta(days=1)).isoformat(),
+        'period_end': (timezone.now() + timezone.timedelta(days=1)).isoformat(),
     }
-    response = api_client.post('/api/recommendations/', data)
-    assert response.status_code == 201
-    rec_id = response.data['id']
 
-    api_client.force_authenticate(user=operator_user)
-    response = api_client.get(f'/api/recommendations/{rec_id}/')
-    assert response.status_code == 200
-
-    response = api_client.delete(f'/api/recommendations/{rec_id}/')
-    assert response.status_code == 403  # (или 405, если метод запрещен)
 
-
-@pytest.mark.django_db
-def test_report_crud_full_cycle(api_client, agronomist_user, operator_user, admin_user, reports_tmp_dir):
+def test_report_crud_full_cycle(api_client, agronomist_user, operator_user, post_report):
     """
-    Тест полного CRUD цикла для отчетов.
+    Тест полного цикла отчета: создание, чтение, скачивание, обновление, удаление.
     """
     from reports.models import Report
     from rest_framework import status
@@ -114,101 +72,182 @@ def test_report_crud_full_cycle(api_client, agronomist_user, operator_user, admi
 
     # 1. CREATE - Создание отчета
     api_client.force_authenticate(user=agronomist_user)
-    payload = {
-        'report_type': 'diagnostics_summary',
-        'period_start': (timezone.now() - timezone.timedelta(days=1)).isoformat(),
-        'period_end': (timezone.now() + timezone.timedelta(days=1)).isoformat(),
-    }
-    response = api_client.post('/api/reports/', payload, format='json')
+    response = post_report()
     assert response.status_code == status.HTTP_201_CREATED
     assert response.data['data']['diagnostics']['total'] == 1
-    assert response.data['file_path']
     report_id = response.data['id']
+
+    # 2. READ - Чтение детальной информации: JSON-файл записан задачей после фиксации транзакции
+    response = api_client.get(f'/api/reports/{report_id}/')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['id'] == report_id
+    assert response.data['report_type'] == 'diagnostics_summary'
+    assert response.data['status'] == 'ready'
     stored_file = Path(response.data['file_path'])
     assert stored_file.exists()
-    content = json.loads(stored_file.read_text(encoding='utf-8'))
+    with stored_file.open('rb') as fp:
+        content = json.load(fp)
     assert content['diagnostics']['total'] == 1
 
-    # 2. READ - Чтение списка отчетов
+    # 3. READ - Чтение списка отчетов
     response = api_client.get('/api/reports/')
     assert response.status_code == status.HTTP_200_OK
     assert response.data['count'] >= 1
+    # Карточка списка получает итоги без поля data
+    listed = next(r for r in response.data['results'] if r['id'] == report_id)
+    assert 'data' not in listed
+    assert listed['summary'] == {'diagnostics': 1}
 
-    # 3. READ - Чтение детальной информации
-    response = api_client.get(f'/api/reports/{report_id}/')
+    # 4. DOWNLOAD - Скачивание файла отчета
+    response = api_client.get(f'/api/reports/{report_id}/download/')
     assert response.status_code == status.HTTP_200_OK
-    assert response.data['id'] == report_id
-    assert response.data['report_type'] == 'diagnostics_summary'
+    assert 'attachment' in response.get('Content-Disposition', '')
+    assert response['Content-Type'] == 'application/json'
+    response.close()
 
-    # 4. UPDATE - Обновление отчета
+    # 5. UPDATE - Обновление отчета
     response = api_client.patch(f'/api/reports/{report_id}/', {'report_type': 'updated_type'})
     assert response.status_code == status.HTTP_200_OK
     assert response.data['report_type'] == 'updated_type'
 
-    # 5. DELETE - Удаление отчета
+    # 6. DELETE - Удаление отчета
     response = api_client.delete(f'/api/reports/{report_id}/')
     assert response.status_code == status.HTTP_204_NO_CONTENT
-    assert not Report.objects.filter(id=report_id).exists()
+    assert Report.objects.count() == 0
+
+
+def test_report_excel_rendered_once(api_client, agronomist_user, post_report, reports_tmp_dir):
+    """
+    Тест: XLSX генерируется задачей при первом скачивании и затем отдаётся из сохранённого файла.
+    """
+    api_client.force_authenticate(user=agronomist_user)
+    response = post_report()
+    assert response.status_code == 201
+    report_id = response.data['id']
+    xlsx_file = reports_tmp_dir / f'report_{report_id}.xlsx'
+
+    response = api_client.get(f'/api/reports/{report_id}/download-excel/')
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    response.close()
+    assert xlsx_file.exists()
+    assert response['Cache-Control'] == 'private, no-cache'
+    etag = response['ETag']
+
+    # Повторное скачивание с тем же ETag — без тела ответа
+    response = api_client.get(f'/api/reports/{report_id}/download-excel/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    # Слабый тег (nginx помечает им сжатые ответы) в списке и If-Modified-Since тоже дают 304
+    response = api_client.get(f'/api/reports/{report_id}/download-excel/', HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+    assert response.status_code == 304
+    response = api_client.get(
+        f'/api/reports/{report_id}/download-excel/',
+        HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+    )
+    assert response.status_code == 304
+
+    # Изменение отчёта сбрасывает сгенерированный файл
+    response = api_client.patch(f'/api/reports/{report_id}/', {'report_type': 'full_report'})
+    assert response.status_code == 200
+    assert not xlsx_file.exists()
+
+    # Новый тип отчёта строится из своих выборок, а не из закэшированных для прежнего типа
+    response = api_client.get(f'/api/reports/{report_id}/download-excel/')
+    assert response.status_code == 200
+    response.close()
+    assert response['ETag'] != etag
 
 
-@pytest.mark.django_db
-def test_report_download(api_client, agronomist_user, operator_user, reports_tmp_dir):
+def test_report_excel_rebuilt_when_file_missing(api_client, agronomist_user, post_report, reports_tmp_dir):
     """
-    Тест: Скачивание файла отчета.
+    Тест: пропавший с диска XLSX строится заново, а пока генерация идёт, новые задачи не ставятся.
     """
     from reports.models import Report
+    from reports.services import RENDER_LOCK_TIMEOUT, acquire_render_lock, release_render_lock
+
+    api_client.force_authenticate(user=agronomist_user)
+    report_id = post_report().data['id']
+    xlsx_file = reports_tmp_dir / f'report_{report_id}.xlsx'
+    api_client.get(f'/api/reports/{report_id}/download-excel/').close()
+    xlsx_file.unlink()
+
+    # Генерация уже идёт — ответ 202 без новой задачи
+    assert acquire_render_lock(report_id, 'xlsx')
+    response = api_client.get(f'/api/reports/{report_id}/download-excel/')
+    assert response.status_code == 202
+    assert 'task_id' not in response.data
+    assert not xlsx_file.exists()
+    release_render_lock(report_id, 'xlsx')
+
+    response = api_client.get(f'/api/reports/{report_id}/download-excel/')
+    assert response.status_code == 200
+    response.close()
+    assert xlsx_file.exists()
+    # Отметка о генерации хранится в строке отчёта и снимается задачей
+    assert Report.objects.get(pk=report_id).xlsx_queued_at is None
+
+    # Отметка упавшего воркера не блокирует генерацию дольше RENDER_LOCK_TIMEOUT
+    xlsx_file.unlink()
+    Report.objects.filter(pk=report_id).update(
+        xlsx_queued_at=timezone.now() - timezone.timedelta(seconds=RENDER_LOCK_TIMEOUT + 1),
+    )
+    response = api_client.get(f'/api/reports/{report_id}/download-excel/')
+    assert response.status_code == 200
+    response.close()
+    assert not list(reports_tmp_dir.glob(f'report_{report_id}.xlsx.*.tmp'))
 
-    # Создаем отчет
-    img = Image.objects.create(user=operator_user, file_path="rep.jpg", file_format="jpg", timestamp=timezone.now())
-    disease = Disease.objects.create(name="Test disease", description="desc", symptoms="symp")
-    diag = Diagnosis.objects.create(image=img, disease=disease, confidence=0.88)
 
+def test_report_download_via_accel_redirect(api_client, agronomist_user, post_report, settings):
+    """
+    Тест: при настроенном X-Accel-Redirect тело файла отдаёт nginx, а не Django.
+    """
+    settings.REPORTS_ACCEL_REDIRECT = '/protected/reports/'
     api_client.force_authenticate(user=agronomist_user)
-    payload = {
-        'report_type': 'diagnostics_summary',
-        'period_start': (timezone.now() - timezone.timedelta(days=1)).isoformat(),
-        'period_end': (timezone.now() + timezone.timedelta(days=1)).isoformat(),
-    }
-    response = api_client.post('/api/reports/', payload, format='json')
-    assert response.status_code == 201
+    response = post_report()
     report_id = response.data['id']
 
-    # Скачиваем отчет
     response = api_client.get(f'/api/reports/{report_id}/download/')
     assert response.status_code == 200
-    assert 'attachment' in response.get('Content-Disposition', '')
-    assert response['Content-Type'] == 'application/json'
+    assert response['X-Accel-Redirect'] == f'/protected/reports/report_{report_id}.json'
+    assert 'attachment' in response['Content-Disposition']
+    assert response.content == b''
 
 
-@pytest.mark.django_db
-def test_report_data_isolation(api_client, agronomist_user, operator_user, reports_tmp_dir):
+def test_report_data_isolation(api_client, agronomist_user, operator_user, post_report):
     """
     Тест: Пользователи видят только свои отчеты (кроме админов).
     """
-    from reports.models import Report
-
     # Создаем отчеты для разных пользователей
     api_client.force_authenticate(user=agronomist_user)
-    payload = {
-        'report_type': 'diagnostics_summary',
-        'period_start': (timezone.now() - timezone.timedelta(days=1)).isoformat(),
-        'period_end': (timezone.now() + timezone.timedelta(days=1)).isoformat(),
-    }
-    response = api_client.post('/api/reports/', payload, format='json')
+    response = post_report()
     assert response.status_code == 201
     agro_report_id = response.data['id']
 
     # Оператор создает свой отчет
     api_client.force_authenticate(user=operator_user)
-    response = api_client.post('/api/reports/', payload, format='json')
+    response = post_report()
     assert response.status_code == 201
     operator_report_id = response.data['id']
 
-    # Оператор видит только свой отчет
-    response = api_client.get('/api/reports/')
+    # Оператор видит только свой отчет (COUNT + одна выборка страницы с JOIN)
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get('/api/reports/')
+    assert len(ctx.captured_queries) == 2
     assert response.status_code == 200
     assert response.data['count'] == 1
     assert response.data['results'][0]['id'] == operator_report_id
+    assert 'data' not in response.data['results'][0]
+
+    # Чужой отчёт недоступен, свой читается одной выборкой по первичному ключу
+    response = api_client.get(f'/api/reports/{agro_report_id}/')
+    assert response.status_code == 404
+    response = api_client.get('/api/reports/abc/')
+    assert response.status_code == 404
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get(f'/api/reports/{operator_report_id}/')
+    assert response.status_code == 200
+    assert len(ctx.captured_queries) == 1
+    assert 'ORDER BY' not in ctx.captured_queries[0]['sql']
 
     # Агроном видит свой отчет
     api_client.force_authenticate(user=agronomist_user)
@@ -219,13 +258,49 @@ def test_report_data_isolation(api_client, agronomist_user, operator_user, repor
     assert agro_report_id in report_ids
 
 
-@pytest.mark.django_db
+def test_live_summary_cached_until_data_changes(api_client, agronomist_user, operator_user):
+    """
+    Тест: живая сводка кэшируется и пересчитывается после изменения диагнозов.
+    """
+    api_client.force_authenticate(user=agronomist_user)
+    params = {
+        'period_start': (timezone.now() - timezone.timedelta(days=1)).isoformat(),
+        'period_end': (timezone.now() + timezone.timedelta(days=1)).isoformat(),
+    }
+    response = api_client.get('/api/reports/live-summary/', params)
+    assert response.status_code == 200
+    assert response.data['diagnostics']['total'] == 0
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get('/api/reports/live-summary/', params)
+    assert len(ctx.captured_queries) == 0
+
+    img = Image.objects.create(user=operator_user, file_path="live.jpg", file_format="jpg", timestamp=timezone.now())
+    disease = Disease.objects.create(name="Live disease", description="desc", symptoms="symp")
+    Diagnosis.objects.create(image=img, disease=disease, confidence=0.9)
+    response = api_client.get('/api/reports/live-summary/', params)
+    assert response.data['diagnostics']['total'] == 1
+
+    # Близкие явные периоды не делят запись кэша: сводка считается для своих границ
+    shifted = {**params, 'period_end': (timezone.now() + timezone.timedelta(days=1, minutes=1)).isoformat()}
+    response = api_client.get('/api/reports/live-summary/', shifted)
+    assert response.data['period']['end'] != api_client.get('/api/reports/live-summary/', params).data['period']['end']
+
+
 def test_audit_log_records_actions(api_client, admin_user):
     api_client.force_authenticate(user=admin_user)
     response = api_client.post('/api/greenhouses/', {'name': 'Audit', 'location': 'Test'})
     assert response.status_code == 201
 
-    response = api_client.get('/api/audit-logs/')
+    # Курсорная пагинация без COUNT; values() с JOIN только таблицы пользователей (user__full_name) — один запрос
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get('/api/audit-logs/')
+    assert len(ctx.captured_queries) == 1
     assert response.status_code == 200
-    assert response.data['count'] >= 1
-    assert response.data['results'][0]['action_type'] == 'CREATE'
\ No newline at end of file
+    assert len(response.data['results']) >= 1
+    entry = response.data['results'][0]
+    assert entry['action_type'] == 'CREATE'
+
+    # Список строится из values(), но совпадает с детальным представлением
+    response = api_client.get(f"/api/audit-logs/{entry['id']}/")
+    assert response.data == entry
\ No newline at end of file
@@ -1,31 +1,85 @@
-import json
 from pathlib import Path
-from typing import cast
-from datetime import timedelta
+from datetime import datetime, timedelta
 
+from django.db import transaction
 from django.db.models import QuerySet
-import io
+import orjson
+from django.conf import settings
 from django.http import FileResponse, Http404, HttpResponse
-from rest_framework import mixins, viewsets
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
 from django.utils import dateparse, timezone
 
 from common.audit import AuditLoggingMixin
+from common.roles import is_admin
 from common.typing import RoleAwareUser
-from django.conf import settings
 from .models import AuditLog, Report
-from .serializers import AuditLogSerializer, ReportSerializer
+from .serializers import AuditLogListSerializer, AuditLogSerializer, ReportListSerializer, ReportSerializer
 from .services import (
-    build_excel_report,
-    build_pdf_report,
+    acquire_render_lock,
     build_report_payload_by_type,
-    fetch_detailed_data,
-    generate_report_payload,
-    persist_report_file,
+    cached_report_payload,
+    discard_report_artifacts,
+    summarize_report_payload,
 )
+from .tasks import generate_report_file, render_excel, render_pdf
+
+# Размер буфера чтения файла отчёта при отдаче (1 МиБ — меньше системных вызовов read)
+REPORT_FILE_BUFFER_SIZE = 1 << 20
+# Размер фрагмента, которым файл отчёта потоково отдаётся клиенту
+REPORT_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _parse_dt(val: str | None, fallback: datetime) -> datetime:
+    """Разбирает ISO-дату из query-параметра; наивное время считается в текущем часовом поясе."""
+    if not val:
+        return fallback
+    dt = dateparse.parse_datetime(val)
+    if dt is None:
+        return fallback
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt, timezone.get_current_timezone())
+    return dt
+
+
+def _report_file_response(request, file_path: Path, filename: str, content_type: str) -> HttpResponse:
+    """
+    Отдаёт файл отчёта с ETag/Last-Modified; условные запросы (If-None-Match,
+    If-Modified-Since) обрабатываются ``get_conditional_response`` и получают 304.
+
+    Если задан ``REPORTS_ACCEL_REDIRECT``, байты отдаёт nginx (X-Accel-Redirect),
+    иначе файл потоково читается через ``FileResponse``.
+    """
+    stat = file_path.stat()
+    # Наносекунды и размер различают файл, перестроенный в ту же секунду
+    etag = f'"{file_path.name}-{stat.st_mtime_ns}-{stat.st_size}"'
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if settings.REPORTS_ACCEL_REDIRECT:
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = f'{settings.REPORTS_ACCEL_REDIRECT}{file_path.name}'
+            response['Content-Disposition'] = content_disposition_header(True, filename)
+        else:
+            response = FileResponse(
+                open(file_path, 'rb', buffering=REPORT_FILE_BUFFER_SIZE),
+                as_attachment=True,
+                filename=filename,
+                content_type=content_type,
+            )
+            response.block_size = REPORT_STREAM_CHUNK_SIZE
+    # Изменение отчёта перестраивает файл, поэтому браузер перепроверяет его при каждом
+    # скачивании — неизменившийся файл обходится ответом 304 по ETag
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 @extend_schema(
@@ -36,7 +90,7 @@ class ReportViewSet(AuditLoggingMixin, viewsets.ModelViewSet):
     """
     ViewSet для управления отчетами системы.
     
-    - GET /api/reports/ - получить список отчетов (пользователи видят только свои, админы - все)
+    - GET /api/reports/ - получить список отчетов без данных (пользователи видят только свои, админы - все)
     - GET /api/reports/{id}/ - получить информацию о конкретном отчете
     - POST /api/reports/ - создать новый отчет за указанный период
     - PUT /api/reports/{id}/ - обновить отчет
@@ -44,17 +98,31 @@ class ReportViewSet(AuditLoggingMixin, viewsets.ModelViewSet):
     - DELETE /api/reports/{id}/ - удалить отчет
     - GET /api/reports/{id}/download/ - скачать файл отчета в формате JSON
     
-    При создании отчета автоматически генерируется JSON файл с данными за указанный период.
+    При создании отчета JSON файл с данными за указанный период генерируется фоновой задачей;
+    пока файл формируется, эндпоинты скачивания возвращают 202 с идентификатором задачи.
     """
-    queryset = Report.objects.select_related('user').all().order_by('-generated_at')
+    # Используется только для интроспекции (роутер, схема); выборка строится в get_queryset
+    queryset = Report.objects.none()
     serializer_class = ReportSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self) -> QuerySet[Report]:
-        user = cast(RoleAwareUser, self.request.user)
-        if user.is_staff or (user.role and user.role.name == 'Администратор'):
-            return self.queryset
-        return self.queryset.filter(user=user)
+        user: RoleAwareUser = self.request.user  # type: ignore[assignment]
+        queryset = Report.objects.select_related('user', 'user__role')
+        if self.action == 'list':
+            # Колонки, которых нет в ReportListSerializer (JSON-данные, файлы XLSX/PDF), не тянем из БД
+            queryset = queryset.defer(
+                'data', 'xlsx_path', 'pdf_path', 'xlsx_queued_at', 'pdf_queued_at',
+            ).order_by('-generated_at')
+        # Для одного отчёта get_object() сам фильтрует по первичному ключу, а сортировка не нужна
+        if is_admin(user):
+            return queryset
+        return queryset.filter(user=user)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ReportListSerializer
+        return super().get_serializer_class()
 
     def perform_create(self, serializer: ReportSerializer) -> None:
         report_type = serializer.validated_data['report_type']
@@ -66,22 +134,61 @@ class ReportViewSet(AuditLoggingMixin, viewsets.ModelViewSet):
         instance = self.save_and_log_create(
             serializer,
             user=self.request.user,
-            data=json.dumps(payload, ensure_ascii=False),
+            data=orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode('utf-8'),
+            summary=summarize_report_payload(payload),
             file_path='',
+            status=Report.STATUS_PENDING,
+        )
+        # Задача ставится только после фиксации транзакции — воркер не увидит незаписанный отчёт
+        transaction.on_commit(lambda: generate_report_file.delay(instance.id))
+        # В синхронном режиме Celery вне транзакции файл уже записан — подтягиваем путь и статус для ответа
+        instance.refresh_from_db(fields=['file_path', 'status'])
+
+    def perform_update(self, serializer: ReportSerializer) -> None:
+        super().perform_update(serializer)
+        discard_report_artifacts(serializer.instance.id)
+
+    def perform_destroy(self, instance: Report) -> None:
+        report_id = instance.id
+        super().perform_destroy(instance)
+        discard_report_artifacts(report_id)
+
+    def _serve_rendered(self, report: Report, extension: str, task, content_type: str):
+        """Отдаёт готовый XLSX/PDF или ставит его генерацию в очередь (202)."""
+        path_field = f'{extension}_path'
+        stored_path = getattr(report, path_field)
+        if not stored_path or not Path(stored_path).exists():
+            if stored_path:
+                # Путь сохранён, а файла нет (другой хост, ручная очистка) — строим заново
+                Report.objects.filter(pk=report.pk).update(**{path_field: ''})
+            payload = {'status': Report.STATUS_PENDING}
+            # Пока генерация идёт, повторные скачивания не ставят новых задач
+            if acquire_render_lock(report.id, extension):
+                payload['task_id'] = task.delay(report.id).id
+            # В синхронном режиме Celery файл уже построен
+            report.refresh_from_db(fields=[path_field])
+            stored_path = getattr(report, path_field)
+            if not stored_path or not Path(stored_path).exists():
+                return Response(payload, status=status.HTTP_202_ACCEPTED)
+
+        return _report_file_response(
+            self.request,
+            Path(stored_path),
+            f'report_{report.id}.{extension}',
+            content_type,
         )
-        report_file = persist_report_file(instance.id, payload)
-        instance.file_path = str(report_file)
-        instance.save(update_fields=['file_path'])
 
     @extend_schema(
         summary='Скачать файл отчета',
-        description='Скачивает JSON файл отчета по указанному ID',
+        description='Скачивает JSON файл отчета по указанному ID. Пока файл формируется, возвращает 202.',
         tags=['Отчеты']
     )
     @action(detail=True, methods=['get'], url_path='download')
     def download(self, request, pk=None):
         """Скачать файл отчёта."""
         report = self.get_object()
+        if report.status == Report.STATUS_PENDING:
+            return Response({'status': report.status}, status=status.HTTP_202_ACCEPTED)
         if not report.file_path:
             raise Http404('Файл отчёта не найден')
         
@@ -89,61 +196,32 @@ class ReportViewSet(AuditLoggingMixin, viewsets.ModelViewSet):
         if not file_path.exists():
             raise Http404('Файл отчёта не существует на сервере')
         
-        return FileResponse(
-            open(file_path, 'rb'),
-            as_attachment=True,
-            filename=f'report_{report.id}.json',
-            content_type='application/json',
-        )
+        return _report_file_response(request, file_path, f'report_{report.id}.json', 'application/json')
 
     @extend_schema(
         summary='Скачать отчет в Excel (XLSX)',
-        description='Генерирует XLSX с плоским представлением key/value данных отчета.',
+        description='Отдаёт XLSX с оформленными таблицами отчета. При первом запросе файл генерируется фоновой задачей (ответ 202 с task_id).',
         tags=['Отчеты']
     )
     @action(detail=True, methods=['get'], url_path='download-excel')
     def download_excel(self, request, pk=None):
         """Скачать отчет в XLSX (оформленные таблицы)."""
-        report = self.get_object()
-        start_dt, end_dt = report.period_start, report.period_end
-        user = cast(RoleAwareUser, report.user)
-        reporter = user.full_name if getattr(user, 'full_name', '') else user.username
-        reporter_role = getattr(getattr(user, 'role', None), 'name', '')
-        details = fetch_detailed_data(start_dt, end_dt)
-        summary = build_report_payload_by_type(start_dt, end_dt, report.report_type)
-
-        wb = build_excel_report(report, details, summary, reporter, reporter_role)
-        buf = io.BytesIO()
-        wb.save(buf)
-        buf.seek(0)
-        response = HttpResponse(
-            buf.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        return self._serve_rendered(
+            self.get_object(),
+            'xlsx',
+            render_excel,
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
         )
-        response['Content-Disposition'] = f'attachment; filename="report_{report.id}.xlsx"'
-        return response
 
     @extend_schema(
         summary='Скачать отчет в PDF',
-        description='Генерирует простой PDF с ключами и значениями отчета.',
+        description='Отдаёт PDF с таблицами отчета. При первом запросе файл генерируется фоновой задачей (ответ 202 с task_id).',
         tags=['Отчеты']
     )
     @action(detail=True, methods=['get'], url_path='download-pdf')
     def download_pdf(self, request, pk=None):
         """Скачать отчет в PDF (таблицы)."""
-        report = self.get_object()
-        start_dt, end_dt = report.period_start, report.period_end
-        user = cast(RoleAwareUser, report.user)
-        reporter = user.full_name if getattr(user, 'full_name', '') else user.username
-        reporter_role = getattr(getattr(user, 'role', None), 'name', '')
-
-        details = fetch_detailed_data(start_dt, end_dt)
-        summary = build_report_payload_by_type(start_dt, end_dt, report.report_type)
-
-        pdf = build_pdf_report(report, details, summary, reporter, reporter_role)
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="report_{report.id}.pdf"'
-        return response
+        return self._serve_rendered(self.get_object(), 'pdf', render_pdf, 'application/pdf')
 
     @extend_schema(
         summary='Онлайн сводка (живые данные)',
@@ -156,26 +234,25 @@ class ReportViewSet(AuditLoggingMixin, viewsets.ModelViewSet):
         period_start_str = request.query_params.get('period_start')
         period_end_str = request.query_params.get('period_end')
 
-        now = timezone.now()
-        default_start = now - timedelta(days=30)
+        # Период по умолчанию заканчивается на ближайшей границе часа: опросы дашборда
+        # в течение часа считают одну и ту же сводку и попадают в один ключ кэша
+        default_end = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        default_start = default_end - timedelta(days=30)
 
-        def parse_dt(val, fallback):
-            if not val:
-                return fallback
-            dt = dateparse.parse_datetime(val)
-            if dt is None:
-                return fallback
-            if timezone.is_naive(dt):
-                dt = timezone.make_aware(dt, timezone.get_current_timezone())
-            return dt
+        start_dt = _parse_dt(period_start_str, default_start)
+        end_dt = _parse_dt(period_end_str, default_end)
 
-        start_dt = parse_dt(period_start_str, default_start)
-        end_dt = parse_dt(period_end_str, now)
-
-        payload = generate_report_payload(start_dt, end_dt)
+        payload = cached_report_payload(start_dt, end_dt)
         return Response(payload)
 
 
+class AuditLogCursorPagination(CursorPagination):
+    """Курсорная пагинация журнала: LIMIT по индексу вместо OFFSET и COUNT по всей таблице."""
+
+    ordering = ('-created_at', '-id')
+    page_size = 100
+
+
 @extend_schema(
     tags=['Отчеты'],
     description='Просмотр журнала аудита системы. Доступно только администраторам. Содержит историю всех изменений в системе.'
@@ -184,7 +261,7 @@ class AuditLogViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets
     """
     ViewSet для просмотра журнала аудита системы.
     
-    - GET /api/audit-logs/ - получить список записей журнала аудита (требуется роль Администратор)
+    - GET /api/audit-logs/ - получить список записей журнала аудита постранично, по курсору next/previous (требуется роль Администратор)
     - GET /api/audit-logs/{id}/ - получить информацию о конкретной записи аудита (требуется роль Администратор)
     
     Журнал аудита содержит информацию о всех изменениях в системе:
@@ -198,3 +275,15 @@ class AuditLogViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets
     queryset = AuditLog.objects.select_related('user').all().order_by('-created_at')
     serializer_class = AuditLogSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = AuditLogCursorPagination
+
+    def get_queryset(self):
+        if self.action == 'list':
+            # Список отдаётся из словарей values() — без создания экземпляров моделей
+            return AuditLog.objects.values(*AuditLogListSerializer.LIST_VALUES)
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return AuditLogListSerializer
+        return super().get_serializer_class()
@@ -0,0 +1,55 @@
+"""
+JWT-аутентификация, загружающая пользователя вместе с ролью.
+"""
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User
+from .services import cache_auth_user, get_cached_auth_user
+
+
+class RoleAwareJWTAuthentication(JWTAuthentication):
+    """
+    То же, что ``JWTAuthentication``, но роль пользователя подтягивается JOIN'ом.
+
+    Проверки прав и ``get_queryset`` обращаются к ``user.role`` в каждом запросе —
+    без ``select_related`` это отдельный SELECT по таблице ролей. При общем для
+    всех воркеров кэше (``AUTH_USER_CACHE``) поля пользователя и роли кэшируются
+    по id и сбрасываются сигналами ``users.signals``.
+    """
+
+    def get_user(self, validated_token: Token) -> User:
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_auth_user(user_id) if settings.AUTH_USER_CACHE else None
+        if user is None:
+            try:
+                user = self.user_model.objects.select_related('role').get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            if settings.AUTH_USER_CACHE:
+                cache_auth_user(user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class RoleAwareJWTScheme(SimpleJWTScheme):
+    """Описание схемы Bearer-токена для Swagger (та же, что у SimpleJWT)."""
+
+    target_class = 'users.authentication.RoleAwareJWTAuthentication'
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-15 23:12
+
+from django.db import migrations, models
+
+
+def mark_admin_roles(apps, schema_editor):
+    Role = apps.get_model('users', 'Role')
+    Role.objects.filter(name='Администратор').update(is_admin=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='role',
+            name='is_admin',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Администраторская роль'),
+        ),
+        migrations.RunPython(mark_admin_roles, migrations.RunPython.noop),
+    ]
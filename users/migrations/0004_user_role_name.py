@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-15 23:17
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_role_name(apps, schema_editor):
+    Role = apps.get_model('users', 'Role')
+    User = apps.get_model('users', 'User')
+    User.objects.filter(role__isnull=False).update(
+        role_name=Subquery(Role.objects.filter(pk=OuterRef('role_id')).values('name')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_role_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='role_name',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=100, null=True, verbose_name='Название роли'),
+        ),
+        migrations.RunPython(fill_role_name, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,15 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
+from common.roles import ADMIN_ROLE
+
 
 class Role(models.Model):
     # id создается автоматически (BigAutoField)
     name = models.CharField(max_length=100, verbose_name="Название роли")
+    # Флаг вместо сравнения названия роли со строкой при каждой проверке прав
+    is_admin = models.BooleanField(default=False, db_index=True, verbose_name="Администраторская роль")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Дата изменения")
 
     class Meta:
         db_table = 'roles'  # [cite: 801]
@@ -14,6 +19,12 @@ class Role(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Роль «Администратор», созданная по названию, остаётся администраторской
+        if self.name == ADMIN_ROLE:
+            self.is_admin = True
+        super().save(*args, **kwargs)
+
 
 class User(AbstractUser):
     # Стандартные поля Django (username, email, password, is_active, date_joined as created_at) уже есть.
@@ -22,6 +33,10 @@ class User(AbstractUser):
     full_name = models.CharField(max_length=255, verbose_name="Полное имя")
     role = models.ForeignKey(Role, on_delete=models.PROTECT, null=True, blank=True, related_name='users',
                              verbose_name="Роль")
+    # Копия Role.name: списки пользователей отдают название роли без JOIN.
+    # NULL у пользователя без роли; при переименовании роли обновляется в users.signals
+    role_name = models.CharField(max_length=100, null=True, blank=True, editable=False, db_index=True,
+                                 verbose_name="Название роли")
 
     # Поле created_at в Django обычно называется date_joined, но добавим явное, если нужно строго по ТЗ
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата регистрации")
@@ -29,4 +44,12 @@ class User(AbstractUser):
     class Meta:
         db_table = 'users'  # [cite: 802]
         verbose_name = 'Пользователь'
-        verbose_name_plural = 'Пользователи'
\ No newline at end of file
+        verbose_name_plural = 'Пользователи'
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'role' in update_fields:
+            self.role_name = self.role.name if self.role_id is not None else None
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'role_name'}
+        super().save(*args, **kwargs)
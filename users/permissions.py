@@ -1,11 +1,20 @@
-from typing import Sequence
+from typing import Collection
 
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from common.roles import ADMIN_ROLE, is_admin
 from common.typing import RequestWithUser, RoleAwareUser, RoleCheckContext
 
 
-def _has_role(user: RoleAwareUser, roles: Sequence[str]) -> bool:
+# Наборы ролей создаются один раз при импорте; проверка вхождения — по хэшу
+_AGRO_ADMIN = frozenset({'Агроном', ADMIN_ROLE})
+_OP = frozenset({'Оператор'})
+
+
+def _has_role(user: RoleAwareUser, roles: Collection[str]) -> bool:
+    # Результат is_admin уже запомнен на пользователе, если его проверял get_queryset
+    if ADMIN_ROLE in roles and is_admin(user):
+        return True
     return RoleCheckContext(user=user, target_roles=roles).matches()
 
 
@@ -19,14 +28,14 @@ class IsAgronomistOrAdmin(BasePermission):
             return False
         if request.method in SAFE_METHODS:
             return True
-        return _has_role(request.user, ['Агроном', 'Администратор'])
+        return _has_role(request.user, _AGRO_ADMIN)
 
 
 class IsOperator(BasePermission):
     def has_permission(self, request: RequestWithUser, view) -> bool:
         if not request.user or not request.user.is_authenticated:
             return False
-        return _has_role(request.user, ['Оператор'])
+        return _has_role(request.user, _OP)
 
 
 class IsAdminOrAgronomistOnly(BasePermission):
@@ -38,5 +47,5 @@ class IsAdminOrAgronomistOnly(BasePermission):
         user = getattr(request, 'user', None)
         if not user or not user.is_authenticated:
             return False
-        return _has_role(user, ['Агроном', 'Администратор'])
+        return _has_role(user, _AGRO_ADMIN)
 
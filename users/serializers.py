@@ -4,10 +4,10 @@ from .models import User, Role
 class RoleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Role
-        fields = '__all__'
+        fields = ('id', 'name', 'is_admin')
 
 class UserSerializer(serializers.ModelSerializer):
-    role_name = serializers.CharField(source='role.name', read_only=True)
+    role_name = serializers.CharField(read_only=True)
 
     class Meta:
         model = User
@@ -17,4 +17,21 @@ class UserSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Хешируем пароль при создании
         user = User.objects.create_user(**validated_data)
-        return user
\ No newline at end of file
+        return user
+
+class UserListSerializer(serializers.Serializer):
+    """
+    Строка списка пользователей из ``values()``: роль отдаётся как ``role_id``
+    без обращения к связанной модели, набор полей — тот же, что у ``UserSerializer``.
+    """
+
+    id = serializers.IntegerField(read_only=True)
+    username = serializers.CharField(read_only=True)
+    email = serializers.CharField(read_only=True)
+    full_name = serializers.CharField(read_only=True)
+    role = serializers.IntegerField(source='role_id', read_only=True, allow_null=True)
+    role_name = serializers.CharField(read_only=True, allow_null=True)
+    is_active = serializers.BooleanField(read_only=True)
+
+    # Колонки для values(): внешний ключ роли читается по attname
+    LIST_VALUES = tuple('role_id' if f == 'role' else f for f in UserSerializer.Meta.fields)
@@ -0,0 +1,87 @@
+"""
+Кэширование данных пользователей, которые часто читаются и редко меняются.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import Role, User
+
+ME_CACHE_TIMEOUT = 60
+AUTH_USER_CACHE_TIMEOUT = 300
+USERS_COUNT_TIMEOUT = 30
+USERS_COUNT_KEY = 'users:count'
+# Поля, достаточные для проверок прав и /api/users/me/. Хэш пароля в кэш не попадает:
+# остальные поля экземпляра остаются отложенными и при обращении читаются из БД
+AUTH_USER_FIELDS = ('id', 'username', 'email', 'full_name', 'is_active', 'is_staff', 'is_superuser',
+                    'role_id', 'role_name')
+AUTH_ROLE_FIELDS = ('id', 'name', 'is_admin')
+
+
+def me_cache_key(user_id: int) -> str:
+    return f'user:me:{user_id}'
+
+
+def auth_user_cache_key(user_id: int) -> str:
+    return f'user:auth:{user_id}'
+
+
+def _auth_values(instance, names: tuple[str, ...]) -> dict:
+    # Порядок полей модели: from_db сопоставляет значения с concrete_fields по порядку
+    return {f.attname: getattr(instance, f.attname) for f in instance._meta.concrete_fields if f.attname in names}
+
+
+def cache_auth_user(user: User) -> None:
+    """Сохраняет в кэш значения полей пользователя и роли, нужные аутентификации."""
+    payload = {
+        'user': _auth_values(user, AUTH_USER_FIELDS),
+        'role': _auth_values(user.role, AUTH_ROLE_FIELDS) if user.role else None,
+    }
+    cache.set(auth_user_cache_key(user.pk), payload, timeout=AUTH_USER_CACHE_TIMEOUT)
+
+
+def get_cached_auth_user(user_id: int) -> User | None:
+    """Восстанавливает пользователя с ролью из кэша без обращения к БД."""
+    payload = cache.get(auth_user_cache_key(user_id))
+    if payload is None:
+        return None
+    user = User.from_db('default', list(payload['user']), list(payload['user'].values()))
+    role = payload['role']
+    user.role = Role.from_db('default', list(role), list(role.values())) if role else None
+    return user
+
+
+def invalidate_user_caches(user_ids: Iterable[int]) -> None:
+    """
+    Сбрасывает закэшированные профили (``/api/users/me/``) и данные пользователей,
+    которыми пользуется JWT-аутентификация.
+    """
+    keys = []
+    for user_id in user_ids:
+        keys += [me_cache_key(user_id), auth_user_cache_key(user_id)]
+    if keys:
+        cache.delete_many(keys)
+
+
+def roles_version() -> dict:
+    """
+    Время последнего изменения и число ролей — по ним строится ETag списка ролей.
+    Число учитывает удаления, которые не меняют ``updated_at``.
+
+    Не кэшируется: сброс по сигналу не дошёл бы до других процессов без общего кэша,
+    а агрегат по маленькой таблице ролей с индексом по ``updated_at`` дешёвый.
+    """
+    return Role.objects.aggregate(last_modified=Max('updated_at'), total=Count('id'))
+
+
+def roles_etag(request, *args, **kwargs) -> str:
+    version = roles_version()
+    last_modified = version['last_modified']
+    return f"{version['total']}-{last_modified.timestamp() if last_modified else 0}"
+
+
+def invalidate_users_count() -> None:
+    cache.delete(USERS_COUNT_KEY)
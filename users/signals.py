@@ -0,0 +1,29 @@
+"""
+Сигналы приложения пользователей: сброс кэшей при изменении пользователей и ролей.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Role, User
+from .services import invalidate_user_caches, invalidate_users_count
+
+
+@receiver([post_save, post_delete], sender=User)
+def reset_user_cache(sender, instance: User, **kwargs) -> None:
+    invalidate_user_caches([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=User)
+def reset_users_count(sender, created: bool = True, **kwargs) -> None:
+    # Число пользователей меняется только при создании и удалении
+    if created:
+        invalidate_users_count()
+
+
+@receiver(post_save, sender=Role)
+def sync_role_users(sender, instance: Role, created: bool, **kwargs) -> None:
+    if created:
+        return
+    # Название роли хранится у всех её пользователей (User.role_name) — обновляем одним UPDATE
+    User.objects.filter(role=instance).exclude(role_name=instance.name).update(role_name=instance.name)
+    invalidate_user_caches(User.objects.filter(role=instance).values_list('id', flat=True))
@@ -1,7 +1,11 @@
 import pytest
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from .models import Role
+from .services import auth_user_cache_key
 
 User = get_user_model()
 
@@ -13,18 +17,52 @@ def test_user_list_visibility(api_client, admin_user, operator_user, operator_us
     """
     # 1. Админ запрашивает список
     api_client.force_authenticate(user=admin_user)
-    response = api_client.get('/api/users/')
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get('/api/users/')
     assert response.status_code == status.HTTP_200_OK
-    # Должен видеть: себя, 2-х операторов (всего >= 3)
-    assert response.data['count'] >= 3
+    # Должен видеть: себя, 2-х операторов
+    assert response.data['count'] == 3
+    # COUNT + одна выборка страницы, роли не догружаются
+    assert len(ctx.captured_queries) == 2
+
+    # Число пользователей берётся из кэша, пока пользователи не добавлены или удалены
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get('/api/users/')
+    assert len(ctx.captured_queries) == 1
+    User.objects.create_user(username='op3', password='password')
+    response = api_client.get('/api/users/')
+    assert response.data['count'] == 4
 
     # 2. Оператор запрашивает список
     api_client.force_authenticate(user=operator_user)
-    response = api_client.get('/api/users/')
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get('/api/users/')
     assert response.status_code == status.HTTP_200_OK
     # Должен видеть только одну запись (себя)
     assert response.data['count'] == 1
     assert response.data['results'][0]['username'] == operator_user.username
+    assert response.data['results'][0]['role_name'] == 'Оператор'
+    assert len(ctx.captured_queries) == 2
+
+    # Элемент списка совпадает с детальным представлением
+    response_detail = api_client.get(f'/api/users/{operator_user.id}/')
+    assert response.data['results'][0] == response_detail.data
+
+
+@pytest.mark.django_db
+def test_admin_role_flag_grants_admin_access(api_client, operator_user, operator_user_2):
+    """
+    Тест: Права администратора определяются флагом роли, а не её названием.
+    """
+    superintendent = User.objects.create_user(
+        username='chief',
+        password='password',
+        role=Role.objects.create(name='Главный агроном', is_admin=True),
+    )
+    api_client.force_authenticate(user=superintendent)
+    response = api_client.get('/api/users/')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == 3
 
 
 @pytest.mark.django_db
@@ -40,28 +78,85 @@ def test_user_detail_read(api_client, admin_user, operator_user):
 
     # Админ может читать информацию о любом пользователе
     api_client.force_authenticate(user=admin_user)
-    response = api_client.get(f'/api/users/{operator_user.id}/')
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get(f'/api/users/{operator_user.id}/')
     assert response.status_code == status.HTTP_200_OK
     assert response.data['username'] == operator_user.username
+    assert response.data['role_name'] == 'Оператор'
+    # Одним запросом, без догрузки роли
+    assert len(ctx.captured_queries) == 1
 
 
 @pytest.mark.django_db
-def test_user_me_endpoint(api_client, operator_user, admin_user):
+def test_user_me_endpoint(api_client, operator_user, admin_user, settings):
     """
     Тест: Эндпоинт /api/users/me/ возвращает информацию о текущем пользователе.
     """
+    settings.ME_CACHE = True
     # Оператор
     api_client.force_authenticate(user=operator_user)
     response = api_client.get('/api/users/me/')
     assert response.status_code == status.HTTP_200_OK
     assert response.data['username'] == operator_user.username
 
+    # Повторный запрос отдаётся из кэша без обращения к БД
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get('/api/users/me/')
+    assert response.data['username'] == operator_user.username
+    assert len(ctx.captured_queries) == 0
+
     # Админ
     api_client.force_authenticate(user=admin_user)
     response = api_client.get('/api/users/me/')
     assert response.status_code == status.HTTP_200_OK
     assert response.data['username'] == admin_user.username
 
+    # Изменение пользователя сбрасывает закэшированный профиль
+    response = api_client.patch(f'/api/users/{operator_user.id}/', {'full_name': 'Оператор Первый'})
+    assert response.status_code == status.HTTP_200_OK
+    operator_user.refresh_from_db()
+    api_client.force_authenticate(user=operator_user)
+    response = api_client.get('/api/users/me/')
+    assert response.data['full_name'] == 'Оператор Первый'
+
+    # Без общего кэша профиль каждый раз строится заново
+    settings.ME_CACHE = False
+    operator_user.full_name = 'Оператор Второй'
+    User.objects.filter(pk=operator_user.pk).update(full_name=operator_user.full_name)
+    response = api_client.get('/api/users/me/')
+    assert response.data['full_name'] == 'Оператор Второй'
+
+
+@pytest.mark.django_db
+def test_jwt_auth_loads_role_with_user(api_client, operator_user, settings):
+    """
+    Тест: JWT-аутентификация загружает пользователя вместе с ролью одним запросом.
+    """
+    settings.AUTH_USER_CACHE = True
+    response = api_client.post('/api/auth/token/', {'username': 'op1', 'password': 'password'})
+    assert response.status_code == status.HTTP_200_OK
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get('/api/users/me/')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['role_name'] == 'Оператор'
+    assert len(ctx.captured_queries) == 1
+
+    # Пользователь берётся из кэша аутентификации — запросов к БД нет
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get('/api/users/me/')
+    assert response.status_code == status.HTTP_200_OK
+    assert len(ctx.captured_queries) == 0
+    # В кэше только поля для проверок прав, без хэша пароля
+    assert operator_user.password not in cache.get(auth_user_cache_key(operator_user.pk))['user'].values()
+
+    # Деактивация сбрасывает кэш, и токен перестаёт приниматься
+    operator_user.is_active = False
+    operator_user.save()
+    response = api_client.get('/api/users/me/')
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
 
 @pytest.mark.django_db
 def test_create_user_permissions(api_client, admin_user, operator_user, role_operator):
@@ -127,7 +222,7 @@ def test_delete_user_permissions(api_client, admin_user, operator_user, role_ope
     api_client.force_authenticate(user=admin_user)
     response = api_client.delete(f'/api/users/{user_to_delete.id}/')
     assert response.status_code == status.HTTP_204_NO_CONTENT
-    assert not User.objects.filter(id=user_to_delete.id).exists()
+    assert User.objects.count() == 2
 
 
 # --- ROLE TESTS ---
@@ -163,7 +258,25 @@ def test_role_crud_full_cycle(api_client, admin_user, operator_user):
     # 5. DELETE (Админ удаляет роль)
     response = api_client.delete(f'/api/roles/{role_id}/')
     assert response.status_code == status.HTTP_204_NO_CONTENT
-    assert not Role.objects.filter(id=role_id).exists()
+    assert Role.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_role_rename_updates_users(api_client, admin_user, operator_user, role_operator):
+    """
+    Тест: Переименование роли отражается в role_name её пользователей.
+    """
+    api_client.force_authenticate(user=operator_user)
+    assert api_client.get('/api/users/me/').data['role_name'] == 'Оператор'
+
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.patch(f'/api/roles/{role_operator.id}/', {'name': 'Оператор теплицы'})
+    assert response.status_code == status.HTTP_200_OK
+
+    operator_user.refresh_from_db()
+    assert operator_user.role_name == 'Оператор теплицы'
+    api_client.force_authenticate(user=operator_user)
+    assert api_client.get('/api/users/me/').data['role_name'] == 'Оператор теплицы'
 
 
 @pytest.mark.django_db
@@ -183,4 +296,24 @@ def test_role_list_read(api_client, admin_user, operator_user):
     api_client.force_authenticate(user=admin_user)
     response = api_client.get('/api/roles/')
     assert response.status_code == status.HTTP_200_OK
-    assert response.data['count'] >= 2
\ No newline at end of file
+    assert response.data['count'] >= 2
+    etag = response['ETag']
+
+    # Без изменений список не пересылается
+    response = api_client.get('/api/roles/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # Переименование роли через API меняет ETag
+    role = Role.objects.get(name='Role 1')
+    response = api_client.patch(f'/api/roles/{role.id}/', {'name': 'Role 1 renamed'})
+    assert response.status_code == status.HTTP_200_OK
+    response = api_client.get('/api/roles/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+    etag = response['ETag']
+
+    # Удаление роли меняет ETag
+    Role.objects.get(name='Role 2').delete()
+    response = api_client.get('/api/roles/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
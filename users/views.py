@@ -1,16 +1,25 @@
-from typing import List, cast
+from typing import List
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
 from django.db.models import QuerySet
+from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
+from django.views.decorators.http import condition
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import BasePermission, IsAdminUser, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
 
 from .models import Role, User
-from .serializers import RoleSerializer, UserSerializer
+from .serializers import RoleSerializer, UserListSerializer, UserSerializer
+from .services import ME_CACHE_TIMEOUT, USERS_COUNT_KEY, USERS_COUNT_TIMEOUT, me_cache_key, roles_etag
 from common.audit import AuditLoggingMixin
+from common.roles import is_admin
 from common.typing import RoleAwareUser
 
 
@@ -31,10 +40,32 @@ class RoleViewSet(AuditLoggingMixin, viewsets.ModelViewSet):
     
     Доступ: только администраторы системы.
     """
-    queryset = Role.objects.all()
+    # Стабильный порядок для постраничной выдачи (пагинация включена в REST_FRAMEWORK)
+    queryset = Role.objects.order_by('id')
     serializer_class = RoleSerializer
     permission_classes = [IsAdminUser] # Только админ управляет ролями
 
+    # Роли меняются редко: повторный запрос списка с If-None-Match получает 304 без тела
+    @method_decorator(condition(etag_func=roles_etag))
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        return super().list(request, *args, **kwargs)
+
+
+class UserCountPaginator(Paginator):
+    """Paginator, в котором число всех пользователей (список администратора) берётся из кэша."""
+
+    @cached_property
+    def count(self) -> int:
+        # Отфильтрованные выборки (не-админ видит только себя) считаются как обычно
+        if self.object_list.query.has_filters():
+            return super().count
+        return cache.get_or_set(USERS_COUNT_KEY, self.object_list.count, timeout=USERS_COUNT_TIMEOUT)
+
+
+class UserPagination(PageNumberPagination):
+    django_paginator_class = UserCountPaginator
+
+
 @extend_schema(
     tags=['Пользователи и роли'],
     description='Управление пользователями системы. Обычные пользователи могут просматривать только свою информацию, администраторы - всех пользователей.'
@@ -55,21 +86,42 @@ class UserViewSet(AuditLoggingMixin, viewsets.ModelViewSet):
     - Просмотр: все авторизованные пользователи (видят только свою информацию, кроме админов)
     - Создание/Изменение/Удаление: только администраторы
     """
-    queryset = User.objects.all().order_by('id')
+    # Выборка собирается в get_queryset; атрибут нужен роутеру и схеме API
+    queryset = User.objects.none()
     serializer_class = UserSerializer
+    pagination_class = UserPagination
+
+    # Классы прав без состояния — экземпляры создаются один раз и переиспользуются
+    _WRITE_ACTIONS = frozenset({'create', 'update', 'partial_update', 'destroy'})
+    _ADMIN_PERMISSIONS = (IsAdminUser(),)
+    _AUTH_PERMISSIONS = (IsAuthenticated(),)
+
+    # Колонки, которые читает UserSerializer (внешний ключ role в only() указывается по имени поля)
+    _OWN_PROFILE_FIELDS = UserSerializer.Meta.fields
 
     def get_permissions(self) -> List[BasePermission]:
         # Удаление пользователей - только админ
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
-            return [IsAdminUser()]
-        return [IsAuthenticated()]
+        if self.action in self._WRITE_ACTIONS:
+            return list(self._ADMIN_PERMISSIONS)
+        return list(self._AUTH_PERMISSIONS)
 
     def get_queryset(self) -> QuerySet[User]:
-        user = cast(RoleAwareUser, self.request.user)
+        user: RoleAwareUser = self.request.user  # type: ignore[assignment]
         # Админ видит всех, остальные - только себя (специфика безопасности)
-        if user.is_staff or (user.role and user.role.name == 'Администратор'):
-            return self.queryset
-        return self.queryset.filter(id=user.id)
+        # Название роли хранится в самой таблице пользователей — JOIN с ролями не нужен
+        queryset = User.objects.order_by('id')
+        if not is_admin(user):
+            # Не-админу доступна единственная строка — выборка по первичному ключу только нужных колонок
+            queryset = queryset.filter(pk=user.id).only(*self._OWN_PROFILE_FIELDS)
+        if self.action == 'list':
+            # Страница пользователей без экземпляров User: role_name денормализован, JOIN с ролями не нужен
+            return queryset.values(*UserListSerializer.LIST_VALUES)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return UserListSerializer
+        return super().get_serializer_class()
 
     @extend_schema(
         summary='Получить текущего пользователя',
@@ -79,5 +131,13 @@ class UserViewSet(AuditLoggingMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def me(self, request: Request) -> Response:
         """Получить текущего пользователя"""
-        serializer = self.get_serializer(request.user)
-        return Response(serializer.data)
\ No newline at end of file
+        # Профиль опрашивается фронтендом постоянно; при общем кэше (ME_CACHE) он кэшируется
+        # и сбрасывается сигналами users.signals
+        cache_key = me_cache_key(request.user.pk)
+        data = cache.get(cache_key) if settings.ME_CACHE else None
+        if data is None:
+            # Схема ответа фиксирована: контекст запроса и выбор класса через get_serializer не нужны
+            data = UserSerializer(request.user).data
+            if settings.ME_CACHE:
+                cache.set(cache_key, data, timeout=ME_CACHE_TIMEOUT)
+        return Response(data)